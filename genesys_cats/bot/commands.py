@@ -3,33 +3,75 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Bot commands."""
 # pylint: disable=unused-argument
+import asyncio
 import re
-from typing import Awaitable, Callable, Dict, Optional, cast
+from typing import Awaitable, Callable, Dict, List, Optional
 from functools import wraps
-from io import BytesIO
 from logging import getLogger
 
+import attr
 import discord
 from tortoise.exceptions import OperationalError
 from tortoise.transactions import in_transaction
 
 from genesys_cats.bot.helpers import (
     BOT_EMBED_COLOUR,
+    cat_image_file,
     get_server,
+    save_server,
     send_cat,
+    send_error,
     try_send,
 )
 from genesys_cats.config import config
 from genesys_cats.models import Cat, Server, User
 from genesys_cats.util.cats import build_cat_message
-from genesys_cats.util.text import p
+from genesys_cats.util.discord import StaticEmbed
+from genesys_cats.util.text import number_to_words, plural
 
 CommandType = Callable[[discord.Client, str, discord.Message], Awaitable[None]]
-COMMANDS: Dict["re.Pattern[str]", "CommandType"] = {}
 logger = getLogger("commands")
 
+PREFIX = config.prefix.lower()
+PREFIX_LEN = len(PREFIX)
 
-HELP_EMBED = discord.Embed(
+
+@attr.s(auto_attribs=True, slots=True)
+class CommandDispatcher:
+    """
+    Registry of command coroutines.
+
+    All the command regexes are combined into a single alternation with one
+    named group per command, so dispatching a command takes a single regex
+    match regardless of how many commands are registered. Regexes must match
+    the whole command, so they don't need ``^``/``$`` anchors.
+    """
+
+    patterns: List[str] = attr.ib(factory=list)
+    handlers: Dict[str, "CommandType"] = attr.ib(factory=dict)
+    _regex: Optional["re.Pattern[str]"] = attr.ib(default=None, init=False)
+
+    def register(self, regex: str, f: "CommandType") -> None:
+        """Register a command coroutine to a regex."""
+        group = f"cmd{len(self.patterns)}"
+        self.patterns.append(f"(?P<{group}>{regex})")
+        self.handlers[group] = f
+        self._regex = None
+
+    def get_handler(self, command: str) -> Optional["CommandType"]:
+        """Return the coroutine for a command, if any matches."""
+        if self._regex is None:
+            self._regex = re.compile("|".join(self.patterns))
+        match = self._regex.fullmatch(command)
+        if match is None or match.lastgroup is None:
+            return None
+        return self.handlers[match.lastgroup]
+
+
+COMMANDS = CommandDispatcher()
+
+
+HELP_EMBED = StaticEmbed(
     title="🎲 Cats Playing Genesys 🎲",
     description="Available commands:",
     colour=BOT_EMBED_COLOUR,
@@ -40,7 +82,7 @@ def register_command(regex: str, human_readable: str, description: str):
     """Register a command to a regex."""
 
     def decorator(f: CommandType) -> CommandType:
-        COMMANDS[re.compile(regex)] = f
+        COMMANDS.register(regex, f)
         HELP_EMBED.add_field(
             name=f"catbot: {human_readable}", value=description, inline=False
         )
@@ -57,10 +99,8 @@ def admin_only(cmd: CommandType) -> CommandType:
         bot: discord.Client, command: str, message: discord.Message
     ) -> None:
         if not message.author.guild_permissions.administrator:
-            await message.add_reaction("❌")
-            return await message.channel.send(
-                "❌ This is an admin-only command!"
-            )
+            await send_error(message, "❌ This is an admin-only command!")
+            return None
         return await cmd(bot, command, message)
 
     return decorated
@@ -88,20 +128,29 @@ def command_channel_only(
     return decorated
 
 
+def is_command(content: str) -> bool:
+    """
+    Return whether a message is a bot command.
+
+    Only the prefix is lowercased, so checking a message doesn't copy its
+    whole body.
+    """
+    return content[:PREFIX_LEN].lower() == PREFIX
+
+
 async def handle_command(
     bot: discord.Client, message: discord.Message
 ) -> None:
     """Dispatch to the appropriate command coroutine."""
-    command = message.content.lower()[len(config.prefix) :].strip()
-    for regex, coro in COMMANDS.items():
-        if regex.match(command):
-            return await coro(bot, command, message)
-    await message.add_reaction("❌")
-    await message.channel.send("❌ Invalid command!")
+    command = message.content[PREFIX_LEN:].lower().strip()
+    coro = COMMANDS.get_handler(command)
+    if coro is not None:
+        return await coro(bot, command, message)
+    await send_error(message, "❌ Invalid command!")
     raise ValueError(f"Invalid command: {message.content}")
 
 
-@register_command("^help$", "help", "Show this message.")
+@register_command("help", "help", "Show this message.")
 async def show_help(
     bot: discord.Client, command: str, message: discord.Message
 ) -> None:
@@ -110,7 +159,7 @@ async def show_help(
 
 
 @register_command(
-    "^set command channel$",
+    "set command channel",
     "set command channel (admin only)",
     "Set the channel to be used for interaction with the bot.",
 )
@@ -127,7 +176,7 @@ async def set_command_channel(
         )
         return
     server_obj.command_channel_id = message.channel.id
-    await server_obj.save()
+    await save_server(server_obj)
     await message.add_reaction("✅")
     embed = discord.Embed(
         title="✅ Success!",
@@ -146,7 +195,7 @@ async def set_command_channel(
 
 
 @register_command(
-    "^set dice channel$",
+    "set dice channel",
     "set dice channel (admin only)",
     "Set the channel to be used by the cats to play RPGs.",
 )
@@ -164,7 +213,7 @@ async def set_dice_channel(
         )
         return
     server_obj.cat_channel_id = message.channel.id
-    await server_obj.save()
+    await save_server(server_obj)
     await message.add_reaction("✅")
     embed = discord.Embed(
         title="✅ Success!",
@@ -183,7 +232,7 @@ async def set_dice_channel(
 
 
 @register_command(
-    "^adopt$",
+    "adopt",
     "adopt",
     "Adopt the current adoptable cat, if any.",
 )
@@ -194,14 +243,15 @@ async def adopt(
     server_obj = await get_server(message)
     if server_obj.command_channel_id is None:
         return
-    logger.info("Adopt cat called")
-    cat = cast(Optional[Cat], server_obj.current_adoptable_cat)
-    logger.info("got cat %s", cat)
+    # Prefetched by get_server, so this is never an awaitable
+    cat: Optional[Cat] = server_obj.current_adoptable_cat  # type: ignore
+    logger.info("command: adopt %s", cat)
     if cat is None:
-        await message.add_reaction("❌")
-        await bot.get_channel(server_obj.command_channel_id).send(
+        await send_error(
+            message,
             f"❌ {message.author.mention}, "
-            f"there are no adoptable cats at the moment."
+            f"there are no adoptable cats at the moment.",
+            bot.get_channel(server_obj.command_channel_id),
         )
         return
     try:
@@ -209,40 +259,41 @@ async def adopt(
             owner, _ = await User.get_or_create(discord_id=message.author.id)
             cnt = await owner.cats.all().count()
             if cnt >= 3:
-                await message.add_reaction("❌")
-                await bot.get_channel(server_obj.command_channel_id).send(
+                await send_error(
+                    message,
                     f"❌ {message.author.mention}, "
-                    f"you cannot have more than 3 cats."
+                    f"you cannot have more than 3 cats.",
+                    bot.get_channel(server_obj.command_channel_id),
                 )
                 return
-            await owner.servers.add(server_obj)
-            await owner.save(using_db=connection)
             cat.owner = owner
-            await cat.save(using_db=connection)
             server_obj.current_adoptable_cat = None
-            await server_obj.save(using_db=connection)
+            # These writes don't depend on each other
+            await asyncio.gather(
+                owner.servers.add(server_obj, using_db=connection),
+                cat.save(using_db=connection, update_fields=["owner_id"]),
+                save_server(server_obj, using_db=connection),
+            )
     except OperationalError as err:
         await message.add_reaction("⚠️")
         logger.exception(err)
         await try_send(message, "Something went wrong; try again later.")
         raise RuntimeError("DB error.") from err
-    cat_count = await Cat.filter(owner=owner).count()
-    f = BytesIO()
-    cat.image.save(f, "PNG")
-    f.seek(0)
+    # The new cat is the only one added in the transaction
+    cat_count = cnt + 1
     await message.add_reaction("✅")
     await bot.get_channel(server_obj.command_channel_id).send(
         content=f"💝 {message.author.mention}, "
         f"you have adopted **{cat.name}**, cat #{cat.id}! 💝\n"
-        f"You now have {p.number_to_words(cat_count)} "
-        f"{p.plural('cat', cat_count)}.",
-        file=discord.File(f, filename="cat.png"),
+        f"You now have {number_to_words(cat_count)} "
+        f"{plural('cat', cat_count)}.",
+        file=await cat_image_file(cat),
     )
     return
 
 
 @register_command(
-    r"^show$",
+    "show",
     "show",
     "Show all owned cats.",
 )
@@ -276,7 +327,7 @@ async def show_cats(
 
 
 @register_command(
-    r"^show \d+$",
+    r"show \d+",
     "show <number>",
     "Show the details for a specific cat.",
 )
@@ -288,13 +339,12 @@ async def show_cat_id(
     logger.info("command: %s", command)
     cat_id = int(command.split(maxsplit=1)[1])
     logger.info("showing %s", cat_id)
-    cat = await Cat.filter(
-        id=cat_id,
-    ).first()
+    cat = await Cat.get_or_none(id=cat_id)
     if not cat:
-        await message.add_reaction("❌")
-        await bot.get_channel(server.command_channel_id).send(
-            f"❌ There is no cat with id {cat_id}!"
+        await send_error(
+            message,
+            f"❌ There is no cat with id {cat_id}!",
+            bot.get_channel(server.command_channel_id),
         )
         return
     await send_cat(
@@ -306,7 +356,7 @@ async def show_cat_id(
 
 
 @register_command(
-    r"^current cat$",
+    "current cat",
     "current cat",
     "Show the current adoptable cat, if any.",
 )
@@ -316,15 +366,16 @@ async def current_cat(
 ) -> None:
     """Show the last adoptable cat, if any."""
     logger.info("command: current cat")
-    cat = cast(Optional[Cat], server.current_adoptable_cat)
+    cat: Optional[Cat] = server.current_adoptable_cat  # type: ignore
     if cat is not None:
         await send_cat(message.channel, cat, build_cat_message(cat))
+        return
     await message.channel.send("❌ There are no adoptable cats at the moment.")
     return
 
 
 @register_command(
-    r"^release \d+$",
+    r"release \d+",
     "release <number>",
     "Release a cat you own.",
 )
@@ -336,26 +387,19 @@ async def release_cat_id(
     logger.info("command: %s", command)
     cat_id = int(command.split(maxsplit=1)[1])
     logger.info("releasing %s", cat_id)
-    cat = (
-        await Cat.filter(owner__discord_id=message.author.id, id=cat_id)
-        .order_by("id")
-        .first()
-    )
+    cat = await Cat.get_or_none(owner__discord_id=message.author.id, id=cat_id)
     if not cat:
-        await message.add_reaction("❌")
-        await message.channel.send(
+        await send_error(
+            message,
             f"❌ {message.author.mention}, "
-            f"you don't own a cat with id {cat_id}!"
+            f"you don't own a cat with id {cat_id}!",
         )
         return
     cat.owner = None
     await cat.save()
-    f = BytesIO()
-    cat.image.save(f, "PNG")
-    f.seek(0)
     return await message.channel.send(
         content=f"👋 You have released **{cat.name}**, "
         f"{message.author.mention}! 👋\n"
         f"{cat.pronouns.he.capitalize()} will be missed.",
-        file=discord.File(f, filename="cat.png"),
+        file=await cat_image_file(cat),
     )
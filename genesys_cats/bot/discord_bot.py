@@ -2,15 +2,23 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """The Discord bot itself."""
+import asyncio
 import random
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from logging import getLogger
 
 import discord
 from tortoise import Tortoise
 
-from genesys_cats.bot.commands import handle_command
-from genesys_cats.bot.helpers import get_server, send_cat, spawn_new_cat
+from genesys_cats.bot.commands import handle_command, is_command
+from genesys_cats.bot.helpers import (
+    generate_new_cat,
+    get_recent_authors,
+    get_server,
+    save_server,
+    send_cat,
+    spawn_new_cat,
+)
 from genesys_cats.config import config
 from genesys_cats.genesys.core import GameState
 from genesys_cats.genesys.gm.travel import Travel
@@ -27,6 +35,39 @@ async def init_db():
         modules={"models": ["genesys_cats.models"]},
     )
     await Tortoise.generate_schemas()
+    if config.db_url.startswith("sqlite"):
+        # WAL with synchronous=NORMAL only syncs on checkpoints instead of
+        # on every commit, and lets reads proceed during writes.
+        await Tortoise.get_connection("default").execute_script(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+        )
+
+
+# Chances as thresholds for a random 32 bit integer
+ACTIVITY_THRESHOLD = int(config.cat_activity_chance * (1 << 32))
+SPAWN_THRESHOLD = int(config.cat_spawn_chance * (1 << 32))
+
+# Server id -> (genesys_state the GameState was loaded from, GameState)
+_game_states: Dict[int, Tuple[Any, GameState]] = {}
+
+
+def load_game_state(server: Server) -> GameState:
+    """
+    Load the GameState for a server.
+
+    The structured GameState is cached, and reused as long as the Server
+    obj's ``genesys_state`` is the one it was loaded from.
+    """
+    cached = _game_states.get(server.id)
+    if cached is not None and cached[0] is server.genesys_state:
+        return cached[1]
+    try:
+        return converter.structure(server.genesys_state, GameState)
+    except (KeyError, AttributeError, TypeError) as err:
+        logger.critical("Couldn't load state: %s", err)
+        return GameState(current_event=Travel())
 
 
 class CatBot(discord.Client):
@@ -42,7 +83,7 @@ class CatBot(discord.Client):
         """A message was sent in the server."""
         if message.author == self.user:
             return
-        if message.content.lower().startswith("catbot:"):
+        if is_command(message.content):
             # It's a command
             logger.debug("Got a command")
             try:
@@ -52,6 +93,14 @@ class CatBot(discord.Client):
                 logger.exception(e)
                 raise e
 
+        # One draw decides both, using separate halves of the bits so that
+        # activity and spawning stay independent.
+        roll = random.getrandbits(64)
+        cats_active = (roll & 0xFFFFFFFF) < ACTIVITY_THRESHOLD
+        cat_spawns = (roll >> 32) < SPAWN_THRESHOLD
+        if not (cats_active or cat_spawns):
+            return
+
         server_obj = await get_server(message)
         if not server_obj:
             return
@@ -62,44 +111,55 @@ class CatBot(discord.Client):
         ):
             return
 
-        if random.random() < config.cat_activity_chance:
+        if cats_active:
             await self.play_genesys(server_obj, message)
 
-        if random.random() < config.cat_spawn_chance:
-            author_cats = await Cat.filter(owner__discord_id=message.author.id)
-
-            if author_cats:
-                invited_by: Optional[Cat] = random.choice(author_cats)
-            else:
-                invited_by = None
+        if cat_spawns:
+            await self.spawn_cat(server_obj, message)
 
-            await send_cat(
-                self.get_channel(server_obj.cat_channel_id),
-                *await spawn_new_cat(server_obj, invited_by=invited_by)
-            )
+    async def spawn_cat(
+        self, server: Server, message: discord.Message
+    ) -> None:
+        """Spawn a new adoptable cat, invited by one of the author's cats."""
+        # Generate the cat while the author's cats are being fetched
+        author_cats, cat = await asyncio.gather(
+            Cat.filter(owner__discord_id=message.author.id),
+            generate_new_cat(),
+        )
+
+        if author_cats:
+            invited_by: Optional[Cat] = random.choice(author_cats)
+        else:
+            invited_by = None
+
+        await send_cat(
+            self.get_channel(server.cat_channel_id),
+            *await spawn_new_cat(server, cat, invited_by=invited_by)
+        )
 
     async def play_genesys(
         self, server: Server, message: discord.Message
     ) -> None:
         """Get an update for cats playing RPGs."""
-        last_authors = [
-            message.author.id
-            async for message in message.channel.history(limit=5)
-        ]
-        cats = await Cat.filter(owner__discord_id__in=last_authors)
+        last_authors = await get_recent_authors(message.channel)
+        # The history may be cached, so add the current author explicitly
+        author_ids = list(last_authors | {message.author.id})
+        cats = await Cat.filter(owner__discord_id__in=author_ids)
         if not cats:
             return
-        try:
-            state = converter.structure(server.genesys_state, GameState)
-        except (KeyError, AttributeError, TypeError) as err:
-            logger.critical("Couldn't load state: %s", err)
-            state = GameState(current_event=Travel())
+        state = load_game_state(server)
         try:
             message = state.current_event.generate_update(state, cats)
         except Exception as e:
+            # The state may have been left half-updated
+            _game_states.pop(server.id, None)
             logger.exception(e)
             raise e
-        server.genesys_state = converter.unstructure(state)
-        await server.save()
+        genesys_state = converter.unstructure(state)
+        # Many updates are just flavor text and don't change the state
+        if genesys_state != server.genesys_state:
+            server.genesys_state = genesys_state
+            await save_server(server)
+        _game_states[server.id] = (server.genesys_state, state)
         await message.send(self.get_channel(server.cat_channel_id))
         return
@@ -2,38 +2,103 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Utilities for bot use."""
-from typing import Optional, Tuple, cast
+import asyncio
+import time
+from typing import Dict, FrozenSet, Optional, Tuple, cast
 from io import BytesIO
 from logging import getLogger
 
 import discord
+from tortoise.backends.base.client import BaseDBAsyncClient
 from tortoise.exceptions import OperationalError
 from tortoise.transactions import in_transaction
 
 from genesys_cats.models import Cat, Server
 from genesys_cats.util.catgen import generate_cat
-from genesys_cats.util.cats import build_cat_message
+from genesys_cats.util.cats import build_cat_message, render_cat_png
 from genesys_cats.util.discord import make_cat_embed
 
 logger = getLogger("bot_helpers")
 
+# How long, in seconds, a Server obj is reused before it is fetched again.
+SERVER_CACHE_TTL = 30.0
+# Guild id -> (time fetched, Server obj)
+_server_cache: Dict[int, Tuple[float, "Server"]] = {}
+
+# How long, in seconds, the recent authors of a channel are reused.
+RECENT_AUTHORS_TTL = 10.0
+# Channel id -> (time fetched, author ids)
+_recent_authors: Dict[int, Tuple[float, FrozenSet[int]]] = {}
+
 
 async def get_server(message: discord.Message) -> "Server":
-    """Get or create the Server obj for a given Message."""
+    """
+    Get or create the Server obj for a given Message.
+
+    Server objs are cached for ``SERVER_CACHE_TTL`` seconds, so that not
+    every message has to hit the database; use ``save_server`` to save them.
+    """
+    guild_id = message.guild.id
+    cached = _server_cache.get(guild_id)
+    if cached is not None and time.monotonic() - cached[0] < SERVER_CACHE_TTL:
+        return cached[1]
     server_obj = (
-        await Server.filter(discord_id=message.guild.id)
+        await Server.filter(discord_id=guild_id)
         .prefetch_related("current_adoptable_cat")
         .get_or_none()
     )
     if not server_obj:
         server_obj = Server(
-            discord_id=message.guild.id,
+            discord_id=guild_id,
             command_channel_id=message.channel.id,
         )
         await server_obj.save()
+    _server_cache[guild_id] = (time.monotonic(), server_obj)
     return server_obj
 
 
+async def save_server(
+    server: "Server", using_db: Optional[BaseDBAsyncClient] = None
+) -> None:
+    """
+    Save a Server obj.
+
+    The cached Server obj is the one being saved, so it stays cached, unless
+    the save fails or happens in a transaction that may still be rolled
+    back.
+    """
+    if using_db is not None:
+        _server_cache.pop(server.discord_id, None)
+    try:
+        await server.save(using_db=using_db)
+    except OperationalError:
+        _server_cache.pop(server.discord_id, None)
+        raise
+
+
+async def get_recent_authors(
+    channel: discord.TextChannel, limit: int = 5
+) -> FrozenSet[int]:
+    """
+    Return the ids of the authors of the last ``limit`` messages in a
+    channel.
+
+    The result is cached for ``RECENT_AUTHORS_TTL`` seconds, to avoid
+    fetching the channel history for every message.
+    """
+    cached = _recent_authors.get(channel.id)
+    if (
+        cached is not None
+        and time.monotonic() - cached[0] < RECENT_AUTHORS_TTL
+    ):
+        return cached[1]
+    authors = frozenset(
+        [message.author.id async for message in channel.history(limit=limit)]
+    )
+    _recent_authors[channel.id] = (time.monotonic(), authors)
+    return authors
+
+
 async def try_send(message: discord.Message, *args, **kwargs):
     """
     Attempt to reply to a message in a channel, and DM the author if the
@@ -46,29 +111,77 @@ async def try_send(message: discord.Message, *args, **kwargs):
         return await message.author.send(*args, **kwargs)
 
 
+async def send_error(
+    message: discord.Message,
+    content: str,
+    channel: Optional[discord.TextChannel] = None,
+) -> None:
+    """
+    React to a message with ❌ and send an error to ``channel`` (by default,
+    the message's channel).
+
+    Both requests are made concurrently.
+    """
+    if channel is None:
+        channel = message.channel
+    await asyncio.gather(message.add_reaction("❌"), channel.send(content))
+
+
 BOT_EMBED_COLOUR = discord.Colour.from_rgb(254, 200, 193)
 
 
+async def cat_image_file(cat: "Cat") -> discord.File:
+    """
+    Get a cat's image as a Discord file.
+
+    Encoding happens in a worker thread, so that the event loop isn't
+    blocked; the encoded image is cached, so showing the same cat again is
+    cheap.
+    """
+    png = await asyncio.get_running_loop().run_in_executor(
+        None, render_cat_png, cat.body_rgb, cat.eyes_rgb
+    )
+    return discord.File(BytesIO(png), filename="cat.png")
+
+
 async def send_cat(
     channel: discord.TextChannel, cat: "Cat", content: Optional[str] = None
 ):
     """Send a cat to a channel, with a given message."""
     embed = make_cat_embed(cat)
-    f = BytesIO()
-    cat.image.save(f, "PNG")
-    f.seek(0)
     return await channel.send(
         content=content,
-        file=discord.File(f, filename="cat.png"),
+        file=await cat_image_file(cat),
         embed=embed,
     )
 
 
+def _generate_cat_with_image() -> "Cat":
+    """Generate a new cat and render its image into the cache."""
+    cat = generate_cat()
+    render_cat_png(cat.body_rgb, cat.eyes_rgb)
+    return cat
+
+
+async def generate_new_cat() -> "Cat":
+    """
+    Generate a new, unsaved cat.
+
+    The cat and its image are generated in a worker thread, to keep the
+    event loop responsive.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        None, _generate_cat_with_image
+    )
+
+
 async def spawn_new_cat(
-    server: Server, invited_by: Optional["Cat"] = None
+    server: Server, cat: "Cat", invited_by: Optional["Cat"] = None
 ) -> Tuple[Cat, str]:
-    """Spawn a new cat, and return the cat and a spawn message."""
-    cat = generate_cat()
+    """
+    Save a new cat as the adoptable cat for a server, and return the cat and
+    a spawn message.
+    """
     try:
         async with in_transaction() as connection:
             current_adoptable_cat = cast(
@@ -79,7 +192,7 @@ async def spawn_new_cat(
                 await current_adoptable_cat.delete(using_db=connection)
             await cat.save(using_db=connection)
             server.current_adoptable_cat = cat
-            await server.save(using_db=connection)
+            await save_server(server, using_db=connection)
     except OperationalError as err:
         logger.exception(err)
         raise err
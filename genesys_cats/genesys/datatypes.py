@@ -8,7 +8,7 @@ from enum import Enum
 import attr
 
 from genesys_cats.util.rng import fixed_int
-from genesys_cats.util.text import capfirst, p
+from genesys_cats.util.text import capfirst, with_article
 
 
 class LocationType(Enum):
@@ -25,7 +25,7 @@ class LocationType(Enum):
     PLACE_OF_POWER = 6
 
 
-@attr.s(auto_attribs=True, slots=True, auto_detect=True)
+@attr.s(auto_attribs=True, slots=True, auto_detect=True, frozen=True)
 class Location:
     """A location in the game world."""
 
@@ -59,9 +59,29 @@ class NPC:
 
     def __str__(self) -> str:
         if self.generic:
-            return f"{p.a(self.name)}"
+            return f"{with_article(self.name)}"
         return self.name
 
+    def copy(self) -> "NPC":
+        """
+        Return a copy of this NPC, e.g. to track its HP in a fight.
+
+        Much faster than ``attr.evolve``; keep this in sync with the fields.
+        """
+        return NPC(
+            name=self.name,
+            generic=self.generic,
+            attack_attr=self.attack_attr,
+            attack_skill=self.attack_skill,
+            presence=self.presence,
+            willpower=self.willpower,
+            soak=self.soak,
+            hp=self.hp,
+            weapon=self.weapon,
+            weapon_damage=self.weapon_damage,
+            defense=self.defense,
+        )
+
     @property
     def capname(self) -> str:
         """This NPC's name, with the first letter capitalized."""
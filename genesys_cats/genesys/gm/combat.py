@@ -3,8 +3,9 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Combat handling."""
 import random
-from typing import Dict, List, Set, Tuple, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 from logging import getLogger
+from operator import itemgetter
 
 import attr
 from discord import Colour, Embed
@@ -21,8 +22,8 @@ from genesys_cats.genesys.gm.dice import (
 from genesys_cats.models import Cat
 from genesys_cats.util.cats import GenesysStat
 from genesys_cats.util.discord import DiscordMessage
-from genesys_cats.util.rng import fixed_int, random_order
-from genesys_cats.util.text import describe_npcs_list, p
+from genesys_cats.util.rng import coin_flips, fixed_int
+from genesys_cats.util.text import describe_npcs_list, plural, plural_noun
 
 logger = getLogger("combat")
 
@@ -50,7 +51,12 @@ class RollModifiers:
 
 IsCatSlot = bool
 
-CAT_ATTACK_SKILLS = [
+# Indexed by IsCatSlot
+INITIATIVE_EMOJI = ("👺", "😼")
+
+DESPAIR_EFFECTS = ("upgrade difficulty", "boost", "setback")
+
+CAT_ATTACK_SKILLS = (
     ("Archery", GenesysStat.ZOOMIES),
     ("Artillery", GenesysStat.ZOOMIES),
     ("Bap", GenesysStat.CHONK),
@@ -63,7 +69,7 @@ CAT_ATTACK_SKILLS = [
     ("Ranged (Light)", GenesysStat.ZOOMIES),
     ("Slap", GenesysStat.CHONK),
     ("Swording", GenesysStat.CHONK),
-]
+)
 
 
 @attr.s(auto_attribs=True, slots=True, auto_detect=True)
@@ -94,13 +100,14 @@ class Combat(Event):
     ):
         """Start combat."""
         logger.info("Party starts combat.")
-        enemies = [attr.evolve(enemy) for enemy in enemies]
+        enemies = [enemy.copy() for enemy in enemies]
 
         state.current_event = cls(
             next_event=next_event,
             enemies=enemies,
             cats_ambushed=cats_ambushed,
             enemies_ambushed=enemies_ambushed,
+            cat_hps={cat.id: cat.wound_threshold for cat in cats},
         )
         return DiscordMessage(
             content=f"🤼 The party gets in a fight with "
@@ -111,6 +118,7 @@ class Combat(Event):
     def generate_update(
         self, state: "GameState", cats: List["Cat"]
     ) -> DiscordMessage:
+        self.add_new_cats(cats)
         cats_standing = self.cats_standing(cats)
         enemies_standing = self.enemies_standing()
 
@@ -210,12 +218,12 @@ class Combat(Event):
 
         order = [
             is_cat
-            for is_cat, roll in sorted(rolls, key=lambda r: r[1], reverse=True)
+            for is_cat, roll in sorted(rolls, key=itemgetter(1), reverse=True)
         ]
 
         results.add_field(
             name="🔢 Initiative order for the upcoming round 🔢",
-            value=" ".join(["😼" if is_cat else "👺" for is_cat in order]),
+            value=" ".join(map(INITIATIVE_EMOJI.__getitem__, order)),
             inline=False,
         )
 
@@ -235,17 +243,19 @@ class Combat(Event):
         enemies_standing: List[Tuple[int, "NPC"]],
     ) -> DiscordMessage:
         """Have the next cat attack an enemy."""
-        for c in random_order(cats_standing):
-            if c.id not in self.cats_who_have_already_acted:
-                logger.info("Got participant: %s", c)
-                self.cats_who_have_already_acted.add(c.id)
-                cat = c
-                break
-        else:
+        candidates = [
+            c
+            for c in cats_standing
+            if c.id not in self.cats_who_have_already_acted
+        ]
+        if not candidates:
             logger.info("All cats have already acted")
             return DiscordMessage(
                 "😼 All the remaining cats have already acted! 👺"
             )
+        cat = random.choice(candidates)
+        logger.info("Got participant: %s", cat)
+        self.cats_who_have_already_acted.add(cat.id)
 
         skill, att = random.choice(CAT_ATTACK_SKILLS)
         _, target = random.choice(enemies_standing)
@@ -313,14 +323,21 @@ class Combat(Event):
             wounds = max(0, damage - soak)
             messages.append(
                 f"{target.capname} soaks {damage - wounds} "
-                f"damage and takes **{wounds} {p.plural('wound', wounds)}**."
+                f"damage and takes **{wounds} {plural('wound', wounds)}**."
             )
             target.hp -= wounds
         if target.hp <= 0:
             messages.append(f"**{target.capname} is defeated!**")
+            enemies_standing = [
+                (idx, npc)
+                for idx, npc in enemies_standing
+                if npc is not target
+            ]
 
         return DiscordMessage(
-            "\n".join(messages), self.make_embed(cats_standing), cat.image
+            "\n".join(messages),
+            self.make_embed(cats_standing, enemies_standing),
+            cat.image,
         )
 
     # TODO clean this up
@@ -331,17 +348,19 @@ class Combat(Event):
         enemies_standing: List[Tuple[int, "NPC"]],
     ) -> DiscordMessage:
         """Execute an enemy attack."""
-        for idx, npc in random_order(enemies_standing):
-            if idx not in self.enemies_who_have_already_acted:
-                logger.info("Got participant: %s", npc)
-                self.enemies_who_have_already_acted.add(idx)
-                acting = npc
-                break
-        else:
+        enemy_candidates = [
+            (idx, npc)
+            for idx, npc in enemies_standing
+            if idx not in self.enemies_who_have_already_acted
+        ]
+        if not enemy_candidates:
             logger.info("All cats have already acted")
             return DiscordMessage(
                 "😼 All the remaining cats have already acted! 👺"
             )
+        idx, acting = random.choice(enemy_candidates)
+        logger.info("Got participant: %s", acting)
+        self.enemies_who_have_already_acted.add(idx)
 
         target: "Cat" = random.choice(cats_standing)
         dice_pool = DicePool.for_skill(
@@ -408,23 +427,29 @@ class Combat(Event):
             wounds = max(0, damage - soak)
             messages.append(
                 f"{target} soaks {damage - wounds} "
-                f"damage and takes **{wounds} {p.plural('wound', wounds)}**."
+                f"damage and takes **{wounds} {plural('wound', wounds)}**."
             )
             self.cat_hps[target.id] -= wounds
         if self.cat_hps[target.id] <= 0:
             messages.append(f"{target} **is defeated!**")
 
         return DiscordMessage(
-            "\n".join(messages), self.make_embed(cats_standing), target.image
+            "\n".join(messages),
+            self.make_embed(cats_standing, enemies_standing),
+            target.image,
         )
 
     def cats_standing(self, cats: List["Cat"]) -> List["Cat"]:
         """Return a list of the cats who are still alive."""
-        return [
-            cat
-            for cat in cats
-            if self.cat_hps.setdefault(cat.id, cat.wound_threshold) > 0
-        ]
+        hps = self.cat_hps
+        return [cat for cat in cats if hps.get(cat.id, 0) > 0]
+
+    def add_new_cats(self, cats: List["Cat"]) -> None:
+        """Start any cats that have joined the fight at full health."""
+        hps = self.cat_hps
+        for cat in cats:
+            if cat.id not in hps:
+                hps[cat.id] = cat.wound_threshold
 
     def enemies_standing(self) -> List[Tuple[int, "NPC"]]:
         """
@@ -432,36 +457,45 @@ class Combat(Event):
         """
         return [(i, npc) for i, npc in enumerate(self.enemies) if npc.hp > 0]
 
-    def make_embed(self, cats: List["Cat"]) -> Embed:
-        """Build an embed with an overview of the combat status."""
+    def make_embed(
+        self,
+        cats: List["Cat"],
+        enemies_standing: Optional[List[Tuple[int, "NPC"]]] = None,
+    ) -> Embed:
+        """
+        Build an embed with an overview of the combat status.
+
+        If the caller already knows which enemies are standing, it can pass
+        them in to skip rescanning the enemy list.
+        """
+        if enemies_standing is None:
+            enemies_standing = self.enemies_standing()
+        hps = self.cat_hps
         cats_hps = [
-            (cat, hp)
-            for cat in cats
-            if (hp := self.cat_hps.setdefault(cat.id, cat.wound_threshold)) > 0
+            (cat, hp) for cat in cats if (hp := hps.get(cat.id, 0)) > 0
         ]
         embed = Embed(
             title="⚔️ Combat! ⚔️",
             colour=BOT_EMBED_COLOUR,
         )
 
-        cat_strs = []
-        for i, (cat, hp) in enumerate(cats_hps, start=1):
-            cat_str = f"{i}. {cat} [{hp}/{cat.wound_threshold}]"
-            if cat.id in self.cats_who_have_already_acted:
-                cat_str += " ✅"
-            cat_strs.append(cat_str)
+        cats_acted = self.cats_who_have_already_acted
+        cat_strs = [
+            f"{i}. {cat} [{hp}/{cat.wound_threshold}]"
+            f"{' ✅' if cat.id in cats_acted else ''}"
+            for i, (cat, hp) in enumerate(cats_hps, start=1)
+        ]
 
         embed.add_field(
             name="😼 Party 😼",
             value="\n".join(cat_strs) or "None remaining!",
         )
 
-        enemies = []
-        for i, (idx, npc) in enumerate(self.enemies_standing(), start=1):
-            enemy_str = f"{i}. {npc.capname}"
-            if idx in self.enemies_who_have_already_acted:
-                enemy_str += " ✅"
-            enemies.append(enemy_str)
+        enemies_acted = self.enemies_who_have_already_acted
+        enemies = [
+            f"{i}. {npc.capname}{' ✅' if idx in enemies_acted else ''}"
+            for i, (idx, npc) in enumerate(enemies_standing, start=1)
+        ]
 
         embed.add_field(
             name="👺 Enemies 👺",
@@ -470,7 +504,7 @@ class Combat(Event):
         embed.add_field(
             name="⏱ Remaining initiative slots ⏱",
             value="".join(
-                ["😼" if slot else "👺" for slot in self.initiative_remaining]
+                map(INITIATIVE_EMOJI.__getitem__, self.initiative_remaining)
             )
             or "Rolling initiative!",
             inline=False,
@@ -487,7 +521,13 @@ class Combat(Event):
         """Spend advantages, threats, triumphs, and despairs."""
 
         # TODO: split this into smaller functions
-        roll = attr.evolve(roll_result)
+        # Copy, since the counts are spent below
+        roll = DiceResult(
+            successes=roll_result.successes,
+            advantages=roll_result.advantages,
+            triumphs=roll_result.triumphs,
+            despairs=roll_result.despairs,
+        )
 
         is_crit = False
         messages = []
@@ -510,43 +550,37 @@ class Combat(Event):
             roll.triumphs -= 1
 
         # Spend rest of triumphs on upgrades
-        enemy_upgrades = 0
-        own_upgrades = 0
-        while roll.triumphs > 0:
-            upgrade_own = random.getrandbits(1)
-            if upgrade_own:
-                own_upgrades += 1
-                own_modifiers.upgrades += 1
-            else:
-                enemy_upgrades += 1
-                enemy_modifiers.difficulty_upgrades += 1
-            roll.triumphs -= 1
+        own_upgrades = coin_flips(roll.triumphs)
+        enemy_upgrades = roll.triumphs - own_upgrades
+        own_modifiers.upgrades += own_upgrades
+        enemy_modifiers.difficulty_upgrades += enemy_upgrades
+        roll.triumphs = 0
 
         # Spend triumphs
         triumphs_spent = enemy_upgrades + own_upgrades
         spends_triumphs_str = (
             f"{attacker_str} spends {triumphs_spent} "
-            f"{p.plural('Triumph', triumphs_spent)}"
+            f"{plural('Triumph', triumphs_spent)}"
         )
         if enemy_upgrades and own_upgrades:
             messages.append(
                 f"{spends_triumphs_str} "
                 f"to upgrade the next ally roll {own_upgrades}"
-                f"{p.plural_noun('time', own_upgrades)} and upgrade "
+                f"{plural_noun('time', own_upgrades)} and upgrade "
                 f"the difficulty of the next opponent's roll "
-                f"{p.plural_noun('time', enemy_upgrades)}."
+                f"{plural_noun('time', enemy_upgrades)}."
             )
         elif own_upgrades:
             messages.append(
                 f"{spends_triumphs_str} "
                 f"to upgrade the next ally roll {own_upgrades}"
-                f"{p.plural_noun('time', own_upgrades)}."
+                f"{plural_noun('time', own_upgrades)}."
             )
         elif enemy_upgrades:
             messages.append(
                 f"{spends_triumphs_str} "
                 f"to upgrade the difficulty of the next opponent's roll "
-                f"{p.plural_noun('time', enemy_upgrades)}."
+                f"{plural_noun('time', enemy_upgrades)}."
             )
 
         if (roll.advantages >= crit_rating) and not is_crit:
@@ -557,45 +591,37 @@ class Combat(Event):
             )
             roll.advantages -= crit_rating
 
-        enemy_setbacks = 0
-        own_boosts = 0
-        advantages_spent = roll.advantages
-        while roll.advantages > 0:
-            if roll.advantages >= 2:
-                enemy_setbacks += 1
-                enemy_modifiers.setback += 1
-                roll.advantages -= 2
-                continue
-            roll.advantages -= 1
-            own_boosts += 1
-            own_modifiers.boost += 1
+        advantages_spent = max(roll.advantages, 0)
+        enemy_setbacks, own_boosts = divmod(advantages_spent, 2)
+        enemy_modifiers.setback += enemy_setbacks
+        own_modifiers.boost += own_boosts
+        roll.advantages -= advantages_spent
 
         spends_advantages = (
             f"{attacker_str} spends {advantages_spent} "
-            f"{p.plural('Advantage', advantages_spent)}"
+            f"{plural('Advantage', advantages_spent)}"
         )
         if enemy_setbacks and own_boosts:
             messages.append(
                 f"{spends_advantages} "
                 f"to grant allies {own_boosts} Boost "
-                f"{p.plural_noun('die', own_boosts)} and force the "
+                f"{plural_noun('die', own_boosts)} and force the "
                 f"opponents to take {enemy_setbacks} Setback "
-                f"{p.plural_noun('die', enemy_setbacks)} on the next roll."
+                f"{plural_noun('die', enemy_setbacks)} on the next roll."
             )
         elif enemy_setbacks:
             messages.append(
                 f"{spends_advantages} "
                 f"to force the opponents to take {enemy_setbacks} Setback"
-                f"{p.plural_noun('die', enemy_setbacks)} on the next roll."
+                f"{plural_noun('die', enemy_setbacks)} on the next roll."
             )
         elif own_boosts:
             messages.append(
                 f"{spends_advantages} to grant allies {own_boosts} Boost "
-                f"{p.plural_noun('die', own_boosts)} on the next roll."
+                f"{plural_noun('die', own_boosts)} on the next roll."
             )
 
-        while roll.despairs > 0:
-            despair = random.choice(["upgrade difficulty", "boost", "setback"])
+        for despair in random.choices(DESPAIR_EFFECTS, k=roll.despairs):
             if despair == "upgrade difficulty":
                 own_modifiers.difficulty_upgrades += 1
                 messages.append(
@@ -615,34 +641,79 @@ class Combat(Event):
                     f"will have to take an additional Setback die on their "
                     f"roll."
                 )
-            roll.despairs -= 1
-
-        own_setbacks = 0
-        enemy_boosts = 0
-        threats = -roll.advantages
-        while threats >= 2:
-            add_setback = random.getrandbits(1)
-            if add_setback:
-                own_setbacks += 1
-                own_modifiers.setback += 1
-                threats -= 2
-                continue
-            enemy_boosts += 1
-            enemy_modifiers.boost += 1
-            threats -= 2
-            continue
+        roll.despairs = 0
+
+        threat_pairs = max(-roll.advantages, 0) // 2
+        own_setbacks = coin_flips(threat_pairs)
+        enemy_boosts = threat_pairs - own_setbacks
+        own_modifiers.setback += own_setbacks
+        enemy_modifiers.boost += enemy_boosts
 
         if enemy_boosts:
             messages.append(
                 f"{attacker_str}'s opponents get {enemy_boosts} additional "
-                f"Boost {p.plural_noun('die', enemy_boosts)} on the next "
+                f"Boost {plural_noun('die', enemy_boosts)} on the next "
                 f"roll due to the Threats."
             )
         if own_setbacks:
             messages.append(
                 f"{attacker_str}'s allies get {own_setbacks} additional "
-                f"Setback {p.plural_noun('die', own_setbacks)} on the "
+                f"Setback {plural_noun('die', own_setbacks)} on the "
                 f"next roll due to the Threats."
             )
 
         return is_crit, messages
+
+
+@attr.s(auto_attribs=True, slots=True, auto_detect=True)
+class CombatStats:
+    """Outcomes of a batch of simulated fights."""
+
+    cat_wins: int = 0
+    enemy_wins: int = 0
+    unfinished: int = 0
+    updates: List[int] = attr.ib(factory=list)
+
+    @property
+    def fights(self) -> int:
+        """The number of fights simulated."""
+        return self.cat_wins + self.enemy_wins + self.unfinished
+
+    @property
+    def cat_win_rate(self) -> float:
+        """The fraction of fights won by the cats."""
+        return self.cat_wins / self.fights if self.fights else 0.0
+
+
+def simulate_combat(
+    cats: List[Cat],
+    enemies: List[NPC],
+    n_iter: int = 1000,
+    max_updates: int = 500,
+) -> CombatStats:
+    """
+    Fight the same battle ``n_iter`` times, without sending anything to
+    Discord, and tally the outcomes.
+
+    This runs the regular Combat rules, so it's meant for balancing
+    encounters rather than for use while the bot is running. Fights that
+    haven't ended after ``max_updates`` updates are counted as unfinished.
+    """
+    stats = CombatStats()
+    for _ in range(n_iter):
+        # The fight is over once Combat hands over to its next event
+        state = GameState(current_event=None)  # type: ignore
+        Combat.start(state, cats, state.current_event, enemies)
+        combat = state.current_event
+        updates = 0
+        while state.current_event is combat and updates < max_updates:
+            combat.generate_update(state, cats)
+            updates += 1
+        stats.updates.append(updates)
+        if state.current_event is combat:
+            stats.unfinished += 1
+        elif combat.cats_standing(cats):  # type: ignore
+            stats.cat_wins += 1
+        else:
+            stats.enemy_wins += 1
+    return stats
@@ -48,10 +48,11 @@ def get_participating_cats(
     participation based on a personality stat.
     """
     participating_cats = []
+    attr_name = attr.value
 
     for cat in random_order(cats):
         base_roll = 100
-        base_attr = getattr(cat, attr.value)
+        base_attr = getattr(cat, attr_name)
         spontaneity_offset = cat.spontaneity * random.uniform(-1, 1)
         target = (base_roll + base_attr + spontaneity_offset) / 300
         if negative:
@@ -3,36 +3,37 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Utilities for working with Genesys dice."""
 import random
-from typing import List, Tuple
-from functools import total_ordering
+from typing import List, Optional, Tuple
+from functools import lru_cache, total_ordering
 
 import attr
+import numpy as np
 
 from genesys_cats.config import config
 from genesys_cats.models import Cat
 from genesys_cats.util.cats import GenesysStat, percentage_to_genesys_attr
-from genesys_cats.util.text import p
+from genesys_cats.util.text import number_to_words, plural
 
 # Successes, Advantages, Triumphs, Despairs
-BOOST = [
+BOOST = (
     (0, 0, 0, 0),
     (0, 0, 0, 0),
     (1, 0, 0, 0),
     (1, 1, 0, 0),
     (0, 2, 0, 0),
     (0, 1, 0, 0),
-]
+)
 
-SETBACK = [
+SETBACK = (
     (0, 0, 0, 0),
     (0, 0, 0, 0),
     (-1, 0, 0, 0),
     (-1, 0, 0, 0),
     (0, -1, 0, 0),
     (0, -1, 0, 0),
-]
+)
 
-ABILITY = [
+ABILITY = (
     (0, 0, 0, 0),
     (1, 0, 0, 0),
     (1, 0, 0, 0),
@@ -41,9 +42,9 @@ ABILITY = [
     (0, 1, 0, 0),
     (1, 1, 0, 0),
     (0, 2, 0, 0),
-]
+)
 
-DIFFICULTY = [
+DIFFICULTY = (
     (0, 0, 0, 0),
     (-1, 0, 0, 0),
     (-2, 0, 0, 0),
@@ -52,9 +53,9 @@ DIFFICULTY = [
     (0, -1, 0, 0),
     (0, -2, 0, 0),
     (-1, -1, 0, 0),
-]
+)
 
-PROFICIENCY = [
+PROFICIENCY = (
     (0, 0, 0, 0),
     (1, 0, 0, 0),
     (1, 0, 0, 0),
@@ -67,9 +68,9 @@ PROFICIENCY = [
     (0, 2, 0, 0),
     (0, 2, 0, 0),
     (0, 0, 1, 0),
-]
+)
 
-CHALLENGE = [
+CHALLENGE = (
     (0, 0, 0, 0),
     (-1, 0, 0, 0),
     (-1, 0, 0, 0),
@@ -82,7 +83,91 @@ CHALLENGE = [
     (0, -2, 0, 0),
     (0, -2, 0, 0),
     (0, 0, 0, 1),
-]
+)
+
+# Each face packed into a single int, one 16-bit lane per result type, so
+# that a whole handful of dice can be tallied with one sum(). Every lane is
+# biased by LANE_BIAS to keep it non-negative.
+LANE_BITS = 16
+LANE_MASK = (1 << LANE_BITS) - 1
+LANE_BIAS = 4
+
+
+def pack_faces(
+    faces: Tuple[Tuple[int, int, int, int], ...]
+) -> Tuple[int, ...]:
+    """Pack each face of a die into a single int."""
+    return tuple(
+        sum(
+            (value + LANE_BIAS) << (lane * LANE_BITS)
+            for lane, value in enumerate(face)
+        )
+        for face in faces
+    )
+
+
+PACKED_ABILITY = pack_faces(ABILITY)
+PACKED_PROFICIENCY = pack_faces(PROFICIENCY)
+PACKED_DIFFICULTY = pack_faces(DIFFICULTY)
+PACKED_CHALLENGE = pack_faces(CHALLENGE)
+PACKED_BOOST = pack_faces(BOOST)
+PACKED_SETBACK = pack_faces(SETBACK)
+
+# The face tables as arrays, for rolling many times at once
+ABILITY_ARRAY = np.array(ABILITY)
+PROFICIENCY_ARRAY = np.array(PROFICIENCY)
+DIFFICULTY_ARRAY = np.array(DIFFICULTY)
+CHALLENGE_ARRAY = np.array(CHALLENGE)
+BOOST_ARRAY = np.array(BOOST)
+SETBACK_ARRAY = np.array(SETBACK)
+
+
+@lru_cache(maxsize=256)
+def describe_dice_result(
+    successes: int,
+    advantages: int,
+    triumphs: int,
+    despairs: int,
+) -> str:
+    """Describe a dice result in words, e.g. "one Success"."""
+    results = []
+    if successes != 0:
+        if successes > 0:
+            results.append(
+                f"{number_to_words(successes)} "
+                f"{plural('Success', successes)}"
+            )
+        else:
+            results.append(
+                f"{number_to_words(-successes)}"
+                f" {plural('Failure', -successes)}"
+            )
+    if advantages != 0:
+        if advantages > 0:
+            results.append(
+                f"{number_to_words(advantages)} "
+                f"{plural('Advantage', advantages)}"
+            )
+        else:
+            results.append(
+                f"{number_to_words(-advantages)}"
+                f" {plural('Threat', -advantages)}"
+            )
+    if triumphs > 0:
+        results.append(
+            f"{number_to_words(triumphs)} {plural('Triumph', triumphs)}"
+        )
+    if despairs > 0:
+        results.append(
+            f"{number_to_words(despairs)} {plural('Despair', despairs)}"
+        )
+    if not results:
+        return "a wash"
+    if len(results) == 1:
+        return results[0]
+    if len(results) == 2:
+        return f"{results[0]} and {results[1]}"
+    return ", ".join(results[:-1]) + f", and {results[-1]}"
 
 
 @total_ordering
@@ -102,55 +187,71 @@ class DiceResult:
     def __lt__(self, other) -> bool:
         if not isinstance(other, DiceResult):
             return NotImplemented
-        return (
-            self.successes + self.triumphs - self.despairs,
+        net = self.successes + self.triumphs - self.despairs
+        other_net = other.successes + other.triumphs - other.despairs
+        if net != other_net:
+            return net < other_net
+        return self.advantages < other.advantages
+
+    def __str__(self) -> str:
+        return describe_dice_result(
+            self.successes,
             self.advantages,
-        ) < (
-            other.successes + other.triumphs - other.despairs,
-            other.advantages,
+            self.triumphs,
+            self.despairs,
         )
 
-    def __str__(self) -> str:
-        results = []
-        if self.successes != 0:
-            if self.successes > 0:
-                results.append(
-                    f"{p.number_to_words(self.successes)} "
-                    f"{p.plural('Success', self.successes)}"
-                )
-            else:
-                results.append(
-                    f"{p.number_to_words(-self.successes)}"
-                    f" {p.plural('Failure', -self.successes)}"
-                )
-        if self.advantages != 0:
-            if self.advantages > 0:
-                results.append(
-                    f"{p.number_to_words(self.advantages)} "
-                    f"{p.plural('Advantage', self.advantages)}"
-                )
-            else:
-                results.append(
-                    f"{p.number_to_words(-self.advantages)}"
-                    f" {p.plural('Threat', -self.advantages)}"
-                )
-        if self.triumphs > 0:
-            results.append(
-                f"{p.number_to_words(self.triumphs)} "
-                f"{p.plural('Triumph', self.triumphs)}"
-            )
-        if self.despairs > 0:
-            results.append(
-                f"{p.number_to_words(self.despairs)} "
-                f"{p.plural('Despair', self.despairs)}"
-            )
-        if not results:
-            return "a wash"
-        if len(results) == 1:
-            return results[0]
-        if len(results) == 2:
-            return f"{results[0]} and {results[1]}"
-        return ", ".join(results[:-1]) + f", and {results[-1]}"
+
+def upgrade_dice(base: int, upgraded: int, times: int) -> Tuple[int, int]:
+    """
+    Upgrade (or, for negative ``times``, downgrade) ``times`` dice, and
+    return the new numbers of base and upgraded dice.
+
+    Each upgrade turns a base die into an upgraded one; if there are no base
+    dice left, it adds a base die instead, which the next upgrade upgrades.
+    Downgrading turns upgraded dice back into base dice, but never removes
+    dice.
+    """
+    if times >= 0:
+        converted = min(base, times)
+        extra = times - converted
+        return (
+            base - converted + extra % 2,
+            upgraded + converted + extra // 2,
+        )
+    downgraded = min(upgraded, -times)
+    return base + downgraded, upgraded - downgraded
+
+
+@lru_cache(maxsize=256)
+def describe_dice_pool(  # pylint:disable=too-many-arguments
+    ability: int,
+    proficiency: int,
+    difficulty: int,
+    challenge: int,
+    boost: int,
+    setback: int,
+) -> str:
+    """Describe a dice pool in words, e.g. "two Ability dice"."""
+    dice_words = [
+        f"{number_to_words(count)} {label} {'die' if count == 1 else 'dice'}"
+        for count, label in (
+            (ability, "Ability"),
+            (proficiency, "Proficiency"),
+            (difficulty, "Difficulty"),
+            (challenge, "Challenge"),
+            (boost, "Boost"),
+            (setback, "Setback"),
+        )
+        if count
+    ]
+    if not dice_words:
+        return "no dice"
+    if len(dice_words) == 1:
+        return dice_words[0]
+    if len(dice_words) == 2:
+        return f"{dice_words[0]} and {dice_words[1]}"
+    return ", ".join(dice_words[:-1]) + f", and {dice_words[-1]}"
 
 
 @attr.s(auto_attribs=True, slots=True, auto_detect=True)
@@ -193,112 +294,80 @@ class DicePool:
 
     def upgrade(self, times: int = 1) -> "DicePool":
         """Upgrade or downgrade the dice."""
-        upgrades_remaining = times
-
-        # Upgrade
-        while upgrades_remaining > 0:
-            if self.ability > 0:
-                self.ability -= 1
-                self.proficiency += 1
-            else:
-                self.ability += 1
-            upgrades_remaining -= 1
-
-        # Downgrade
-        while upgrades_remaining < 0:
-            if self.proficiency > 0:
-                self.proficiency -= 1
-                self.ability += 1
-                upgrades_remaining += 1
-            else:
-                # Downgrading never removes dice
-                break
-
+        self.ability, self.proficiency = upgrade_dice(
+            self.ability, self.proficiency, times
+        )
         return self
 
     def upgrade_difficulty(self, times: int = 1) -> "DicePool":
         """Upgrade or downgrade the difficulty."""
-        upgrades_remaining = times
-
-        # Upgrade
-        while upgrades_remaining > 0:
-            if self.difficulty > 0:
-                self.difficulty -= 1
-                self.challenge += 1
-            else:
-                self.difficulty += 1
-            upgrades_remaining -= 1
-
-        # Downgrade
-        while upgrades_remaining < 0:
-            if self.challenge > 0:
-                self.challenge -= 1
-                self.difficulty += 1
-                upgrades_remaining += 1
-            else:
-                # Downgrading never removes dice
-                break
-
+        self.difficulty, self.challenge = upgrade_dice(
+            self.difficulty, self.challenge, times
+        )
         return self
 
     def roll(self) -> DiceResult:
         """Roll this DicePool and return a DiceResult."""
-        dice_results = (
-            random.choices(ABILITY, k=self.ability)
-            + random.choices(PROFICIENCY, k=self.proficiency)
-            + random.choices(DIFFICULTY, k=self.difficulty)
-            + random.choices(CHALLENGE, k=self.challenge)
-            + random.choices(BOOST, k=self.boost)
-            + random.choices(SETBACK, k=self.setback)
-        )
-        successes, advantages, triumphs, despairs = zip(*dice_results)
+        rand = random.random
+        total = 0
+        dice = 0
+        for faces, count in (
+            (PACKED_ABILITY, self.ability),
+            (PACKED_PROFICIENCY, self.proficiency),
+            (PACKED_DIFFICULTY, self.difficulty),
+            (PACKED_CHALLENGE, self.challenge),
+            (PACKED_BOOST, self.boost),
+            (PACKED_SETBACK, self.setback),
+        ):
+            if count > 0:
+                # The same draws random.choices(faces, k=count) would make,
+                # without building a list
+                n_faces = len(faces)
+                for _ in range(count):
+                    total += faces[int(rand() * n_faces)]
+                dice += count
+        bias = dice * LANE_BIAS
         return DiceResult(
-            successes=sum(successes),
-            advantages=sum(advantages),
-            triumphs=sum(triumphs),
-            despairs=sum(despairs),
+            successes=(total & LANE_MASK) - bias,
+            advantages=((total >> LANE_BITS) & LANE_MASK) - bias,
+            triumphs=((total >> 2 * LANE_BITS) & LANE_MASK) - bias,
+            despairs=((total >> 3 * LANE_BITS) & LANE_MASK) - bias,
         )
 
-    def __str__(self) -> str:
-        dice_words = []
-        if self.ability:
-            dice_words.append(
-                f"{p.number_to_words(self.ability)} Ability "
-                f"{p.plural('die', self.ability)}"
-            )
-        if self.proficiency:
-            dice_words.append(
-                f"{p.number_to_words(self.proficiency)} Proficiency "
-                f"{p.plural('die', self.proficiency)}"
-            )
-        if self.difficulty:
-            dice_words.append(
-                f"{p.number_to_words(self.difficulty)} Difficulty"
-                f" {p.plural('die', self.difficulty)}"
-            )
+    def roll_many(
+        self, n: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Roll this DicePool ``n`` times at once, e.g. to estimate odds.
 
-        if self.challenge:
-            dice_words.append(
-                f"{p.number_to_words(self.challenge)} Challenge"
-                f" {p.plural('die', self.challenge)}"
-            )
-        if self.boost:
-            dice_words.append(
-                f"{p.number_to_words(self.boost)} Boost"
-                f" {p.plural('die', self.boost)}"
-            )
-        if self.setback:
-            dice_words.append(
-                f"{p.number_to_words(self.setback)} Setback "
-                f"{p.plural('die', self.setback)}"
-            )
-        if not dice_words:
-            return "no dice"
-        if len(dice_words) == 1:
-            return dice_words[0]
-        if len(dice_words) == 2:
-            return f"{dice_words[0]} and {dice_words[1]}"
-        return ", ".join(dice_words[:-1]) + f", and {dice_words[-1]}"
+        Returns an (n, 4) array with a row of successes, advantages,
+        triumphs and despairs per roll.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        results = np.zeros((n, 4), dtype=np.int64)
+        for faces, count in (
+            (ABILITY_ARRAY, self.ability),
+            (PROFICIENCY_ARRAY, self.proficiency),
+            (DIFFICULTY_ARRAY, self.difficulty),
+            (CHALLENGE_ARRAY, self.challenge),
+            (BOOST_ARRAY, self.boost),
+            (SETBACK_ARRAY, self.setback),
+        ):
+            if count > 0:
+                rolled = rng.integers(len(faces), size=(n, count))
+                results += faces[rolled].sum(axis=1)
+        return results
+
+    def __str__(self) -> str:
+        return describe_dice_pool(
+            self.ability,
+            self.proficiency,
+            self.difficulty,
+            self.challenge,
+            self.boost,
+            self.setback,
+        )
 
 
 def get_cat_dice_pool(  # pylint:disable=too-many-arguments
@@ -318,7 +387,7 @@ def get_cat_dice_pool(  # pylint:disable=too-many-arguments
     )
 
 
-RANDOM_BOOST_REASONS = [
+RANDOM_BOOST_REASONS = (
     "being a great cat",
     "being based",
     "being high on catnip",
@@ -327,14 +396,30 @@ RANDOM_BOOST_REASONS = [
     "being focused",
     "having recently eaten",
     "impeccable vibes",
-]
+)
 
-RANDOM_SETBACK_REASONS = [
+RANDOM_SETBACK_REASONS = (
     "discourse",
     "horniness",
     "having rotten vibes",
     "being distracted",
-]
+)
+
+
+# Each bonus die is granted with gm_bonus_die_chance, and the second one only
+# if the first one was, so both come with the square of that chance.
+ONE_BONUS_DIE_CHANCE = config.gm_bonus_die_chance
+TWO_BONUS_DICE_CHANCE = config.gm_bonus_die_chance**2
+
+
+def random_bonus_dice_count() -> int:
+    """Return how many (0-2) random bonus dice to grant, with one draw."""
+    roll = random.random()
+    if roll < TWO_BONUS_DICE_CHANCE:
+        return 2
+    if roll < ONE_BONUS_DIE_CHANCE:
+        return 1
+    return 0
 
 
 def grant_random_bonus_dice(
@@ -344,23 +429,13 @@ def grant_random_bonus_dice(
     Grant random bonus dice, mutating the dice pool in place, and return the
     lists of reasons for boost and setback dice.
     """
-    boost = 0
-    if random.random() < config.gm_bonus_die_chance:
-        boost = 1
-        if random.random() < config.gm_bonus_die_chance:
-            boost = 2
-
+    boost = random_bonus_dice_count()
     dice_pool.boost += boost
     boost_reasons = []
     if boost:
         boost_reasons = random.sample(RANDOM_BOOST_REASONS, k=boost)
 
-    setback = 0
-    if random.random() < config.gm_bonus_die_chance:
-        setback = 1
-        if random.random() < config.gm_bonus_die_chance:
-            setback = 2
-
+    setback = random_bonus_dice_count()
     dice_pool.setback += setback
     setback_reasons = []
     if setback:
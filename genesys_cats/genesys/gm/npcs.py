@@ -4,11 +4,14 @@
 """NPC-related lists and functions."""
 import random
 from typing import List, Optional, Tuple
+from bisect import bisect
+from itertools import accumulate
 
 import attr
 
 from genesys_cats.genesys.datatypes import NPC
 from genesys_cats.models import Cat
+from genesys_cats.util.text import plural_verb_phrase
 
 UNIVERSAL_NPCS = [
     NPC("cat"),
@@ -83,24 +86,46 @@ class CombatTemplate:
     forced_enemies: Optional[List[NPC]] = None
     enemies_ambushed: bool = False
     cats_ambushed: bool = True
+    _enemy_types: Tuple[NPC, ...] = attr.ib(init=False, repr=False, eq=False)
+    _cum_weights: Tuple[int, ...] = attr.ib(init=False, repr=False, eq=False)
+    # ``message`` for when several cats are described as starting the fight
+    plural_message: str = attr.ib(init=False, repr=False, eq=False)
+
+    def __attrs_post_init__(self) -> None:
+        # Summed once here, instead of by random.choices on every draw
+        self._enemy_types = tuple(enemy for enemy, _ in self.enemies)
+        self._cum_weights = tuple(accumulate(w for _, w in self.enemies))
+        self.plural_message = plural_verb_phrase(self.message)
 
     def get_enemies(self, cats: List[Cat]) -> List[NPC]:
-        """Get a list of enemies for the encounter."""
+        """
+        Get a list of enemies for the encounter.
+
+        These are the shared template NPCs; Combat.start copies them before
+        the fight, so they can't be damaged.
+        """
         hp_target = random.randint(len(cats) * 3, len(cats) * 10)
 
         if self.forced_enemies:
             # False positive
             # pylint: disable=not-an-iterable
-            enemies = [attr.evolve(en) for en in self.forced_enemies]
+            enemies = list(self.forced_enemies)
         else:
             enemies = []
 
         total_enemy_hp = sum(en.hp for en in enemies)
-        enemy_types, weights = zip(*self.enemies)
+        enemy_types = self._enemy_types
+        cum_weights = self._cum_weights
+        total_weight = float(cum_weights[-1])
+        last = len(cum_weights) - 1
+        rand = random.random
 
         while total_enemy_hp < hp_target:
-            enemy: NPC = random.choices(enemy_types, weights=weights, k=1)[0]
-            enemies.append(attr.evolve(enemy))
+            # The same draw random.choices would make, minus its overhead
+            enemy = enemy_types[
+                bisect(cum_weights, rand() * total_weight, 0, last)
+            ]
+            enemies.append(enemy)
             total_enemy_hp += enemy.hp
 
         return enemies
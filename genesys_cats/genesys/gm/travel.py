@@ -3,7 +3,7 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Downtime events; ie. anything without any action."""
 import random
-from typing import TYPE_CHECKING, Callable, List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 from logging import getLogger
 
 import attr
@@ -38,7 +38,7 @@ from genesys_cats.genesys.gm.npcs import (
 from genesys_cats.util.cats import GenesysStat, PersonalityStat
 from genesys_cats.util.discord import DiscordMessage
 from genesys_cats.util.image import combine_images
-from genesys_cats.util.text import describe_cats_list, p
+from genesys_cats.util.text import describe_cats_list, plural_verb_phrase
 
 if TYPE_CHECKING:
     from genesys_cats.models import Cat
@@ -65,7 +65,7 @@ GETTING_LOST_VERBS = [
     "stumbles aimlessly",
 ]
 
-GENERIC_LOCATIONS = [
+GENERIC_LOCATIONS: Tuple[Location, ...] = (
     # En route
     Location("a", "barren desert", "desert", LocationType.EN_ROUTE),
     Location("a", "stormy coast", "coast", LocationType.EN_ROUTE),
@@ -107,7 +107,26 @@ GENERIC_LOCATIONS = [
     # Places of power
     Location("a", "mysterious ruin", "ruin", LocationType.PLACE_OF_POWER),
     Location("an", "ancient shrine", "shrine", LocationType.PLACE_OF_POWER),
-]
+)
+
+LOCATIONS_BY_TYPE: Dict[LocationType, Tuple[Location, ...]] = {
+    location_type: tuple(
+        loc for loc in GENERIC_LOCATIONS if loc.location_type is location_type
+    )
+    for location_type in LocationType
+}
+
+# The locations the party can travel to next, by the name of the location
+# they're currently in (None, or any unknown name, allows all of them).
+NEXT_LOCATIONS: Dict[Optional[str], Tuple[Location, ...]] = {
+    None: GENERIC_LOCATIONS,
+    **{
+        location.name: tuple(
+            loc for loc in GENERIC_LOCATIONS if loc.name != location.name
+        )
+        for location in GENERIC_LOCATIONS
+    },
+}
 
 
 def meet_generic_npc(
@@ -122,13 +141,10 @@ def meet_generic_npc(
         participating_cats = get_participating_cats(
             cats, PersonalityStat.OUTGOINGNESS
         )
-        if len(participating_cats) == len(cats):
-            participating_cats = []
         npc = random.choice(npc_pool)
         interaction = random.choice(GENERIC_INTERACTIONS)
         if len(participating_cats) > 1:
-            parts = interaction.split(maxsplit=1)
-            interaction = " ".join([p.plural_verb(parts[0])] + parts[1:])
+            interaction = plural_verb_phrase(interaction)
         return DiscordMessage(
             content=f"🗣️ {describe_cats_list(participating_cats)} "
             f"{interaction} "
@@ -145,12 +161,9 @@ def get_lost(state: "GameState", location: Location, cats: List["Cat"]):
     participating_cats = get_participating_cats(
         cats, PersonalityStat.SPONTANEITY
     )
-    if len(participating_cats) == len(cats):
-        participating_cats = []
     description = random.choice(GETTING_LOST_VERBS)
     if len(participating_cats) > 1:
-        parts = description.split(maxsplit=1)
-        description = " ".join([p.plural_verb(parts[0])] + parts[1:])
+        description = plural_verb_phrase(description)
     return DiscordMessage(
         content=f"🧭 {describe_cats_list(participating_cats)} "
         f"{description} "
@@ -182,15 +195,11 @@ def find_thing(
             cats, GenesysStat.PLAYFULNESS
         )
 
-        if len(participating_cats) == len(cats):
-            participating_cats = []
-
         thing = random.choice(things)
         interaction = random.choice(FINDS_VERBS)
 
         if len(participating_cats) > 1:
-            parts = interaction.split(maxsplit=1)
-            interaction = " ".join([p.plural_verb(parts[0])] + parts[1:])
+            interaction = plural_verb_phrase(interaction)
 
         return DiscordMessage(
             content=f"🔍 {describe_cats_list(participating_cats)} "
@@ -214,14 +223,10 @@ def combat_encounter(
             cats, GenesysStat.PLAYFULNESS
         )
 
-        if len(participating_cats) == len(cats):
-            participating_cats = []
-
         encounter = random.choice(encounters)
 
         if len(participating_cats) > 1:
-            parts = encounter.message.split(maxsplit=1)
-            message = " ".join([p.plural_verb(parts[0])] + parts[1:])
+            message = encounter.plural_message
         else:
             message = encounter.message
 
@@ -399,19 +404,12 @@ class Travel(Event):
         logger.info("Travelling")
         reaches = random.choice(TRAVEL_VERBS)
 
-        self.current_location = attr.evolve(
-            random.choice(
-                [
-                    loc
-                    for loc in GENERIC_LOCATIONS
-                    if loc.name
-                    != (
-                        self.current_location.name
-                        if self.current_location
-                        else None
-                    )
-                ]
-            )
+        current_name = (
+            self.current_location.name if self.current_location else None
+        )
+        # Locations are frozen, so they can be shared rather than copied
+        self.current_location = random.choice(
+            NEXT_LOCATIONS.get(current_name, NEXT_LOCATIONS[None])
         )
         return DiscordMessage(
             content=f"🏞 The party {reaches} {self.current_location}. 🏞"
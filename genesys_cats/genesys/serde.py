@@ -2,7 +2,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Serialization/deserialization utilities for RPG state."""
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from cattr import GenConverter
 from cattr.preconf.bson import make_converter
@@ -12,32 +12,54 @@ from genesys_cats.genesys.core import Event, Quest, event_types, quest_types
 converter: GenConverter = make_converter()
 
 
+# Generated (un)structuring functions, by concrete Event/Quest class. These
+# are much faster than the reflective ``*_attrs_asdict``/``*_attrs_fromdict``
+# converter methods, but have to be generated for each class separately.
+_unstructure_fns: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+_structure_fns: Dict[type, Callable[[Dict[str, Any], type], Any]] = {}
+
+
+def _unstructure_tagged(o: Any) -> Dict[str, Any]:
+    cls = o.__class__
+    try:
+        fn = _unstructure_fns[cls]
+    except KeyError:
+        fn = _unstructure_fns[cls] = converter.gen_unstructure_attrs_fromdict(
+            cls
+        )
+    d = fn(o)
+    d["_t"] = cls.__name__
+    return d
+
+
+def _structure_tagged(obj: Dict[str, Any], cls: type) -> Any:
+    try:
+        fn = _structure_fns[cls]
+    except KeyError:
+        fn = _structure_fns[cls] = converter.gen_structure_attrs_fromdict(cls)
+    return fn(obj, cls)
+
+
 def unstructure_event(o: Event) -> Dict[str, Any]:
     """Unstructure an Event into a dictionary."""
-    return {
-        "_t": o.__class__.__name__,
-        **converter.unstructure_attrs_asdict(o),
-    }
+    return _unstructure_tagged(o)
 
 
 def structure_event(obj: Dict[str, Any], _: Any):
     """Structure a dictionary back into an Event."""
-    event_type = obj.pop("_t")
-    return converter.structure_attrs_fromdict(obj, event_types[event_type])
+    # Extra keys are ignored, so "_t" doesn't need to be removed; leaving
+    # ``obj`` unmodified means the same dictionary can be structured again.
+    return _structure_tagged(obj, event_types[obj["_t"]])
 
 
 def unstructure_quest(o: Quest) -> Dict[str, Any]:
     """Unstructure a Quest into a dictionary."""
-    return {
-        "_t": o.__class__.__name__,
-        **converter.unstructure_attrs_asdict(o),
-    }
+    return _unstructure_tagged(o)
 
 
 def structure_quest(obj: Dict[str, Any], _: Any):
     """Structure a dictionary back into a Quest."""
-    event_type = obj.pop("_t")
-    return converter.structure_attrs_fromdict(obj, quest_types[event_type])
+    return _structure_tagged(obj, quest_types[obj["_t"]])
 
 
 converter.register_structure_hook(Event, structure_event)
@@ -2,18 +2,18 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Database models."""
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Tuple
+from functools import cached_property
 
+import rapidjson
 from tortoise import Model, fields
 
 from genesys_cats.util.cats import (
-    CAT_BODY_IMAGE,
-    CAT_EYES_IMAGE,
     highlight_stat,
     percentage_to_genesys_attr,
     personality_title,
+    render_cat_image,
 )
-from genesys_cats.util.image import color_image
 from genesys_cats.util.rng import fixed_int
 from genesys_cats.util.text import Pronouns
 
@@ -33,7 +33,14 @@ class Server(Model):
     ] = fields.ForeignKeyField(
         "models.Cat", null=True, on_delete=fields.SET_NULL
     )
-    genesys_state = fields.JSONField(default=None, null=True)
+    # The game state is (de)serialized on most updates, so always use the
+    # C-accelerated rapidjson rather than falling back to stdlib json.
+    genesys_state = fields.JSONField(
+        default=None,
+        null=True,
+        encoder=rapidjson.dumps,
+        decoder=rapidjson.loads,
+    )
 
     users: fields.ManyToManyRelation["User"]
 
@@ -109,37 +116,48 @@ class Cat(Model):
     def __str__(self) -> str:
         return f"**{self.name}** (#{self.id})"
 
-    @property
+    # These only depend on columns that never change after a cat is created,
+    # so they're computed once per instance.
+
+    @cached_property
     def pronouns(self) -> "Pronouns":
         """This cat's pronouns."""
         return Pronouns.from_pronoun_string(self.pronouns_csv)
 
-    @property
+    @cached_property
     def title(self) -> str:
         """This cat's CK3-style personality title."""
         return personality_title(self)
 
-    @property
+    @cached_property
     def highlight_genesys_stat(self) -> str:
         """Describe this cat's most extreme Genesys stat."""
         return highlight_stat(self)
 
+    @property
+    def body_rgb(self) -> Tuple[int, int, int]:
+        """This cat's body color."""
+        return self.body_r, self.body_g, self.body_b
+
+    @property
+    def eyes_rgb(self) -> Tuple[int, int, int]:
+        """This cat's eye color."""
+        return self.eyes_r, self.eyes_g, self.eyes_b
+
     @property
     def image(self) -> "Image.Image":
-        """This cat's image."""
-        cat_body_image = color_image(
-            (self.body_r, self.body_g, self.body_b), CAT_BODY_IMAGE
-        )
-        cat_eyes_image = color_image(
-            (self.eyes_r, self.eyes_g, self.eyes_b), CAT_EYES_IMAGE
-        )
-        cat_body_image.paste(cat_eyes_image, (0, 0), cat_eyes_image)
-        return cat_body_image
+        """This cat's image. Shared and cached; don't modify it."""
+        return render_cat_image(self.body_rgb, self.eyes_rgb)
+
+    @property
+    def wound_threshold_base(self) -> int:
+        """The random base of this cat's wound threshold."""
+        return fixed_int(f"{self.id}_wound_threshold_base", min_=8, max_=12)
 
     @property
     def wound_threshold(self) -> int:
         """Return the cat's wound threshold."""
-        base = fixed_int(f"{self.id}_wound_threshold_base", min_=8, max_=12)
+        base = self.wound_threshold_base
         bonuses = fixed_int(f"{self.id}_wound_threshold_bonus", min_=0, max_=1)
         return base + bonuses + percentage_to_genesys_attr(self.chonk)
 
@@ -147,9 +165,7 @@ class Cat(Model):
     def strain_threshold(self) -> int:
         """Return the cat's strain threshold."""
         # this is intentionally based on wound threshold
-        wound_threshold_base = fixed_int(
-            f"{self.id}_wound_threshold_base", min_=8, max_=12
-        )
+        wound_threshold_base = self.wound_threshold_base
         bonuses = fixed_int(
             f"{self.id}_strain_threshold_bonus", min_=0, max_=1
         )
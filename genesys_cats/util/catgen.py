@@ -15,13 +15,17 @@ from genesys_cats.util.catgen_data import (
     CAT_PRONOUNS,
     CAT_SUFFIXES,
 )
+from genesys_cats.util.cats import GenesysStat, PersonalityStat
 from genesys_cats.util.image import hsl_to_rgb
-from genesys_cats.util.rng import normal_integer_0_100
+from genesys_cats.util.rng import normal_integers_0_100
 from genesys_cats.util.text import Pronouns, replace_pronouns
 
 PREFIX_CHANCE = 0.075
 SUFFIX_CHANCE = 0.15
 
+# Names of all the stats rolled for a new cat.
+CAT_STATS = tuple(stat.value for stat in (*GenesysStat, *PersonalityStat))
+
 
 def generate_cat_name() -> str:
     """Generate a new cat name."""
@@ -77,15 +81,5 @@ def generate_cat() -> "Cat":
         eyes_r=eyes_r,
         eyes_g=eyes_g,
         eyes_b=eyes_b,
-        chonk=normal_integer_0_100(),
-        zoomies=normal_integer_0_100(),
-        curiosity=normal_integer_0_100(),
-        playfulness=normal_integer_0_100(),
-        fluff=normal_integer_0_100(),
-        purr_volume=normal_integer_0_100(),
-        skittishness=normal_integer_0_100(),
-        outgoingness=normal_integer_0_100(),
-        dominance=normal_integer_0_100(),
-        spontaneity=normal_integer_0_100(),
-        friendliness=normal_integer_0_100(),
+        **dict(zip(CAT_STATS, normal_integers_0_100(len(CAT_STATS)))),
     )
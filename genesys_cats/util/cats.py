@@ -2,13 +2,15 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Cat-related utilities and common constants."""
-from typing import TYPE_CHECKING, NamedTuple, Optional
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
 from enum import Enum
+from functools import lru_cache
 
 import numpy as np
 from PIL import Image
 
 from genesys_cats.config import ASSETS_DIR
+from genesys_cats.util.image import color_image, encode_png
 
 if TYPE_CHECKING:
     from typing import Dict
@@ -48,14 +50,48 @@ class GenesysStat(Enum):
     PURR_VOLUME = "purr_volume"
 
 
-CAT_BODY_IMAGE = np.array(
-    Image.open(str(ASSETS_DIR / "cat_body.png")).convert("RGBA")
+# Only the shape of the cat images matters; they're recolored entirely.
+CAT_BODY_ALPHA = np.array(
+    Image.open(str(ASSETS_DIR / "cat_body.png"))
+    .convert("RGBA")
+    .getchannel("A")
 )
-CAT_EYES_IMAGE = np.array(
-    Image.open(str(ASSETS_DIR / "cat_eyes.png")).convert("RGBA")
+CAT_EYES_ALPHA = np.array(
+    Image.open(str(ASSETS_DIR / "cat_eyes.png"))
+    .convert("RGBA")
+    .getchannel("A")
 )
 
 
+@lru_cache(maxsize=512)
+def render_cat_image(
+    body_rgb: Tuple[int, int, int], eyes_rgb: Tuple[int, int, int]
+) -> Image.Image:
+    """
+    Render a cat image with the given body and eye colors.
+
+    The result is cached and shared between callers, so it must not be
+    modified; ``copy()`` it first if needed.
+    """
+    cat_body_image = color_image(body_rgb, CAT_BODY_ALPHA)
+    cat_eyes_image = color_image(eyes_rgb, CAT_EYES_ALPHA)
+    cat_body_image.paste(cat_eyes_image, (0, 0), cat_eyes_image)
+    return cat_body_image
+
+
+@lru_cache(maxsize=512)
+def render_cat_png(
+    body_rgb: Tuple[int, int, int], eyes_rgb: Tuple[int, int, int]
+) -> bytes:
+    """
+    Render a cat image and encode it as PNG.
+
+    The image only depends on the colors, so the encoded bytes are cached
+    and reused every time the same cat is shown.
+    """
+    return encode_png(render_cat_image(body_rgb, eyes_rgb))
+
+
 class _Titles(NamedTuple):
     """Descriptors for a personality stat."""
 
@@ -141,13 +177,8 @@ def get_descriptor(
     """
     Get an appropriate cat personality title part for a given stat and value.
     """
-    if value < -25:
-        return descriptors[stat].very_low
-    if value < 0:
-        return descriptors[stat].low
-    if value < 25:
-        return descriptors[stat].high
-    return descriptors[stat].very_high
+    # Index into (very_low, low, high, very_high) by the value's bucket
+    return descriptors[stat][(value >= -25) + (value >= 0) + (value >= 25)]
 
 
 def personality_title(cat: "Cat") -> "str":
@@ -179,20 +210,21 @@ def personality_title(cat: "Cat") -> "str":
     return f"{adj} {title}"
 
 
+# How to describe a stat's value, by quarter of the 0-100 range
+STAT_QUANTIFIERS = ("low", "below average", "considerable", "extreme")
+
+
 def highlight_stat(cat: "Cat") -> str:
     """Describe a cat's standout Genesys stat."""
     most_extreme_stat, most_extreme_val = max(
-        [(stat, getattr(cat, stat.value)) for stat in GenesysStat],
+        ((stat, getattr(cat, stat.value)) for stat in GenesysStat),
         key=lambda stat: abs(stat[1] - 50),
     )
-    if most_extreme_val < 25:
-        quantifier = "low"
-    elif most_extreme_val < 50:
-        quantifier = "below average"
-    elif most_extreme_val < 75:
-        quantifier = "considerable"
-    else:
-        quantifier = "extreme"
+    quantifier = STAT_QUANTIFIERS[
+        (most_extreme_val >= 25)
+        + (most_extreme_val >= 50)
+        + (most_extreme_val >= 75)
+    ]
     return f"{quantifier} {most_extreme_stat.value.replace('_', ' ').title()}"
 
 
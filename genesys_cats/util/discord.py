@@ -2,7 +2,8 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Discord-related utilities."""
-from typing import TYPE_CHECKING, Optional
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, Optional
 from io import BytesIO
 
 import attr
@@ -11,12 +12,32 @@ from discord import Colour, Embed
 from PIL.Image import Image
 
 from genesys_cats.util.cats import percentage_to_genesys_attr
-from genesys_cats.util.text import p
+from genesys_cats.util.image import encode_png
+from genesys_cats.util.text import with_article
 
 if TYPE_CHECKING:
     from genesys_cats.models import Cat
 
 
+class StaticEmbed(Embed):
+    """
+    An Embed that is only serialized once.
+
+    Only use this for embeds that are no longer modified once they have
+    been sent, like the help message.
+    """
+
+    def to_dict(self) -> Dict[str, Any]:
+        try:
+            return self._dict_cache
+        except AttributeError:
+            # Embed.to_dict only serializes the base class's slots, so this
+            # attribute doesn't end up in its own output.
+            # pylint: disable=attribute-defined-outside-init
+            self._dict_cache: Dict[str, Any] = super().to_dict()
+            return self._dict_cache
+
+
 @attr.s(auto_attribs=True, slots=True, auto_detect=True, frozen=True)
 class DiscordMessage:
     """A Discord message that may include an embed or image."""
@@ -26,12 +47,17 @@ class DiscordMessage:
     image: Optional[Image] = None
 
     async def send(self, channel: discord.TextChannel) -> None:
-        """Send this message to a given channel."""
+        """
+        Send this message to a given channel.
+
+        The image is encoded in a worker thread, so that the event loop
+        isn't blocked.
+        """
         if self.image is not None:
-            f = BytesIO()
-            self.image.save(f, "PNG")
-            f.seek(0)
-            image = discord.File(f, filename="image.png")
+            png = await asyncio.get_running_loop().run_in_executor(
+                None, encode_png, self.image
+            )
+            image = discord.File(BytesIO(png), filename="image.png")
         else:
             image = None
         await channel.send(
@@ -53,37 +79,36 @@ class DiscordMessage:
         return attr.evolve(self, image=image)
 
 
+# Moons representing each Genesys attribute value, 0-4.
+MOONS = tuple(full * "🌕" + (4 - full) * "🌑" for full in range(5))
+
+
 def percentage_to_moons(stat: int) -> str:
     """
     Convert a percentage stat (from the db) to moons representing the Genesys
     value.
     """
-    genesys = percentage_to_genesys_attr(stat)
-    return genesys * "🌕" + (4 - genesys) * "🌑"
+    return MOONS[percentage_to_genesys_attr(stat)]
 
 
 def make_cat_embed(cat: "Cat") -> Embed:
     """Build an embed for displaying this cat."""
     pr = cat.pronouns
+    they = pr.he.capitalize()
 
     # An X cat of considerable Y.
     tagline = (
-        f"{p.a(cat.descriptor).capitalize()} cat of "
+        f"{with_article(cat.descriptor).capitalize()} cat of "
         f"{cat.highlight_genesys_stat}."
     )
 
     # They like X and dislike Y.
     likes = "like" if pr.plural else "likes"
-    likes_str = (
-        f"{pr.he.capitalize()} {likes} {cat.likes} "
-        f"and dis{likes} {cat.dislikes}."
-    )
+    likes_str = f"{they} {likes} {cat.likes} and dis{likes} {cat.dislikes}."
 
     # They spend their free time doing X.
     spends = "spend" if pr.plural else "spends"
-    hobby_str = (
-        f"{pr.he.capitalize()} {spends} {pr.his} free time {cat.hobby}."
-    )
+    hobby_str = f"{they} {spends} {pr.his} free time {cat.hobby}."
     cat_embed = Embed(
         title=f"{cat.id}. 🐱 {cat.name}, the {cat.title} 🐱",
         description=f"{tagline}\n{likes_str}\n{hobby_str}",
@@ -3,38 +3,65 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Image-related utilities."""
 from typing import List, Optional, Tuple, cast
+from functools import lru_cache
+from io import BytesIO
 
 import numpy as np
 from numpy.typing import ArrayLike
 from PIL import Image, ImageColor
 
 
+@lru_cache(maxsize=4096)
 def hsl_to_rgb(
     hue: int, saturation: int, lightness: int
 ) -> Tuple[int, int, int]:
-    """Convert a HSL color to RGB."""
+    """
+    Convert a HSL color to RGB.
+
+    Cat colors are generated from integer HSL components, so the same ones
+    come up repeatedly; results are cached rather than parsed by Pillow
+    every time.
+    """
     return cast(
         Tuple[int, int, int],
-        ImageColor.getrgb(f"hsl({hue}" f",{saturation}%" f",{lightness}%)"),
+        ImageColor.getrgb(f"hsl({hue},{saturation}%,{lightness}%)"),
     )
 
 
-def color_image(
-    color: Tuple[int, int, int], image_data: ArrayLike
-) -> Image.Image:
-    """Change the color of an image, preserving the alpha channel."""
-    body = np.copy(image_data)
+def color_image(color: Tuple[int, int, int], alpha: ArrayLike) -> Image.Image:
+    """Build a solid-color RGBA image with the given alpha channel."""
+    alpha = np.asarray(alpha, dtype=np.uint8)
+    body = np.empty(alpha.shape + (4,), dtype=np.uint8)
     body[..., :-1] = color
+    body[..., -1] = alpha
     return Image.fromarray(body)
 
 
 def combine_images(images: List[Image.Image]) -> Optional[Image.Image]:
-    """Combine multiple images side by side."""
+    """
+    Combine multiple images side by side.
+
+    A single image is returned as is, rather than copied onto a new canvas.
+    """
     if not images:
         return None
+    if len(images) == 1:
+        return images[0]
     dst = Image.new("RGBA", (sum(im.width for im in images), images[0].height))
     offset = 0
     for image in images:
         dst.paste(image, (offset, 0))
         offset += image.width
     return dst
+
+
+def encode_png(image: Image.Image) -> bytes:
+    """
+    Encode an image as PNG.
+
+    Uses a low compression level; the images are small, and Discord
+    re-encodes them anyway.
+    """
+    f = BytesIO()
+    image.save(f, "PNG", compress_level=1)
+    return f.getvalue()
@@ -4,6 +4,10 @@
 """RNG related utilities."""
 import random
 from typing import List, Sequence, TypeVar
+from bisect import bisect
+from functools import lru_cache
+from heapq import nlargest
+from math import inf, log
 
 T = TypeVar("T")
 
@@ -16,18 +20,14 @@ def select_weighted(
 
     Weighted version of random.select.
     """
-    weights_: "List[float]" = list(weights)
-    idxs: "List[int]" = list(range(len(haystack)))
-    results: "List[T]" = []
-    needed = k - len(results)
-    while needed:
-        for i in random.choices(idxs, weights_, k=needed):
-            if weights_[i]:
-                weights_[i] = 0.0
-                results.append(haystack[i])
-                needed -= 1
-        needed = k - len(results)
-    return results
+    # Efraimidis-Spirakis: each element gets the key u ** (1 / weight), and
+    # the k largest keys win. Compared in log space to avoid underflow.
+    rand = random.random
+    keys = [
+        (log(1.0 - rand()) / weight if weight > 0 else -inf, i)
+        for i, weight in enumerate(weights)
+    ]
+    return [haystack[i] for _, i in nlargest(k, keys)]
 
 
 def random_order(xs: List[T]) -> List[T]:
@@ -35,6 +35,13 @@ def random_order(xs: List[T]) -> List[T]:
     return random.sample(xs, len(xs))
 
 
+def coin_flips(n: int) -> int:
+    """Return how many of `n` fair coin flips came up heads."""
+    if n <= 0:
+        return 0
+    return bin(random.getrandbits(n)).count("1")
+
+
 # Weights for rounded integers [0, 100] generated from a normal
 # distribution with mean = 50 and dev = 20, then normalized to 0..1.
 #
@@ -151,11 +158,26 @@ WEIGHTS = [
 ]
 
 
+WEIGHTED_VALUES = range(len(WEIGHTS))
+
+
 def normal_integer_0_100() -> int:
     """An integer in the range [0, 100] following a normal distribution."""
-    return random.choices(list(range(len(WEIGHTS))), cum_weights=WEIGHTS)[0]
+    # The same draw random.choices would make, since WEIGHTS[-1] == 1.0
+    return bisect(WEIGHTS, random.random())
+
 
+def normal_integers_0_100(k: int) -> List[int]:
+    """``k`` integers in the range [0, 100], see `normal_integer_0_100`."""
+    return random.choices(WEIGHTED_VALUES, cum_weights=WEIGHTS, k=k)
 
+
+@lru_cache(maxsize=4096)
 def fixed_int(seed: str, min_: int, max_: int) -> int:
-    """Return an integer based on a seed."""
+    """
+    Return an integer based on a seed.
+
+    Seeding a Random is expensive, and the same per-cat and per-NPC values
+    are looked up every combat turn, so the results are cached.
+    """
     return random.Random(seed).randint(min_, max_)
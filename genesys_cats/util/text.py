@@ -2,8 +2,10 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 """Utilities for building text."""
-from typing import TYPE_CHECKING, Dict, List, Tuple, Type
-from collections import defaultdict
+import re
+from typing import TYPE_CHECKING, List, Match, Tuple, Type
+from collections import Counter
+from functools import lru_cache
 
 import attr
 from inflect import engine
@@ -14,6 +16,49 @@ if TYPE_CHECKING:
 
 p = engine()
 
+# Placeholders in templates, e.g. "$he$", replaced by `replace_pronouns`
+PRONOUN_PLACEHOLDER = re.compile(r"\$(he|him|his|himself|s)\$")
+
+
+@lru_cache(maxsize=64)
+def number_to_words(n: int) -> str:
+    """Cached ``p.number_to_words``."""
+    return p.number_to_words(n)  # type: ignore
+
+
+@lru_cache(maxsize=128)
+def plural(word: str, count: int) -> str:
+    """Cached ``p.plural``."""
+    return p.plural(word, count)
+
+
+@lru_cache(maxsize=128)
+def plural_noun(word: str, count: int) -> str:
+    """Cached ``p.plural_noun``."""
+    return p.plural_noun(word, count)
+
+
+@lru_cache(maxsize=128)
+def plural_verb(word: str) -> str:
+    """Cached ``p.plural_verb``."""
+    return p.plural_verb(word)
+
+
+@lru_cache(maxsize=256)
+def plural_verb_phrase(phrase: str) -> str:
+    """
+    Pluralize the verb a phrase starts with, e.g. "chats with" becomes
+    "chat with".
+    """
+    parts = phrase.split(maxsplit=1)
+    return " ".join([plural_verb(parts[0])] + parts[1:])
+
+
+@lru_cache(maxsize=256)
+def with_article(word: str) -> str:
+    """Cached ``p.a``: prefix ``word`` with "a" or "an"."""
+    return p.a(word)
+
 
 @attr.s(auto_attribs=True, slots=True, auto_detect=True, frozen=True)
 class Pronouns:
@@ -26,9 +71,13 @@ class Pronouns:
     plural: bool
 
     @classmethod
+    @lru_cache(maxsize=64)
     def from_pronoun_string(cls: Type["Pronouns"], csv: str) -> "Pronouns":
         """
         Build a Pronoun object from a string like "he,him,his,himself,false".
+
+        There are only a few distinct pronoun strings, and Pronouns are
+        immutable, so the results are cached and shared.
         """
         he, him, his, himself, plural = csv.strip().split(",")
         return cls(
@@ -54,13 +103,16 @@ class Pronouns:
 
 def replace_pronouns(s: str, pronouns: Pronouns) -> str:
     """Replace template strings with appropriate pronouns."""
-    return (
-        s.replace("$he$", pronouns.he)
-        .replace("$him", pronouns.him)
-        .replace("$his$", pronouns.his)
-        .replace("$himself$", pronouns.himself)
-        .replace("$s$", "" if pronouns.plural else "s")
-    )
+    if "$" not in s:
+        return s
+
+    def replacement(match: "Match[str]") -> str:
+        placeholder = match.group(1)
+        if placeholder == "s":
+            return "" if pronouns.plural else "s"
+        return getattr(pronouns, placeholder)
+
+    return PRONOUN_PLACEHOLDER.sub(replacement, s)
 
 
 def capfirst(s: str) -> str:
@@ -86,24 +138,21 @@ def describe_npcs_list(npcs: List["NPC"]) -> str:
     if len(npcs) == 1:
         return str(npcs[0])
 
-    npc_counts: Dict[Tuple[str, bool], int] = defaultdict(int)
-
-    for npc in npcs:
-        npc_counts[(npc.name, npc.generic)] += 1
+    npc_counts: "Counter[Tuple[str, bool]]" = Counter(
+        (npc.name, npc.generic) for npc in npcs
+    )
 
     npc_strs = []
 
-    for (name, generic), count in sorted(
-        npc_counts.items(), key=lambda i: i[1], reverse=True
-    ):
+    for (name, generic), count in npc_counts.most_common():
         if count == 1:
             if generic:
-                npc_strs.append(f"{p.a(name)}")
+                npc_strs.append(f"{with_article(name)}")
             else:
                 npc_strs.append(name)
         else:
             if generic:
-                npc_strs.append(f"{p.plural(name, count)}")
+                npc_strs.append(f"{plural(name, count)}")
             else:
                 for _ in range(count):
                     npc_strs.append(name)